@@ -4,6 +4,7 @@ from langchain.memory import ConversationBufferWindowMemory
 from langchain.prompts import PromptTemplate
 
 from app.core.config import get_settings
+from app.core.errors import is_quota_error
 from app.tools.web_search import web_search
 from app.tools.api_tools import get_weather, get_news
 from app.tools.code_executor import execute_python
@@ -67,11 +68,6 @@ def clear_memory(session_id: str) -> None:
     _memories.pop(session_id, None)
 
 
-def _is_quota_error(exc: Exception) -> bool:
-    msg = str(exc).lower()
-    return "resourceexhausted" in msg or "quota exceeded" in msg or "429" in msg
-
-
 def _candidate_models() -> list[str]:
     raw = [settings.GEMINI_MODEL]
     if settings.GEMINI_FALLBACK_MODELS.strip():
@@ -114,12 +110,13 @@ def build_agent_executor(session_id: str, model_name: str) -> AgentExecutor:
     )
 
 
-def run_agent(question: str, session_id: str) -> dict:
+def run_agent(question: str, session_id: str, callbacks: list | None = None) -> dict:
     """
     Run the ReAct agent and return:
     - answer: final answer string
     - steps: list of (tool_name, tool_input, observation) for frontend display
     - session_id
+    `callbacks` are LangChain callback handlers (e.g. the profiler) for this run.
     """
     result = None
     last_quota_error: Exception | None = None
@@ -128,10 +125,10 @@ def run_agent(question: str, session_id: str) -> dict:
     for model_name in models:
         executor = build_agent_executor(session_id, model_name)
         try:
-            result = executor.invoke({"input": question})
+            result = executor.invoke({"input": question}, config={"callbacks": callbacks})
             break
         except Exception as e:
-            if _is_quota_error(e):
+            if is_quota_error(e):
                 last_quota_error = e
                 continue
             raise
@@ -9,6 +9,16 @@ class Settings(BaseSettings):
     GEMINI_MAX_RETRIES: int = 0
     SERPAPI_API_KEY: str = ""
 
+    # Web search backends (see app/tools/search_backends.py)
+    SEARCH_BACKENDS: str = "serpapi,duckduckgo"   # order = preference; name or name=url
+    SEARCH_HEDGE_MS: int = 800          # start the next backend after this; 0 = all at once
+    SEARCH_MERGE_WINDOW_MS: int = 150   # wait this long after the first result to merge others
+    SEARCH_TIMEOUT_S: float = 10.0
+    SEARCH_HEDGED_TIMEOUT_S: float = 4.0   # per-call timeout when another backend can cover
+    SEARCH_WORKERS_PER_BACKEND: int = 8
+    SEARCH_SLOW_MS: int = 3000          # average latency above this demotes a backend
+    SEARCH_DEMOTE_SECONDS: int = 300
+
     # External API keys (optional — agent degrades gracefully without them)
     OPENWEATHER_API_KEY: str = ""
     NEWS_API_KEY: str = ""         # newsapi.org free tier
@@ -17,6 +27,21 @@ class Settings(BaseSettings):
     MAX_ITERATIONS: int = 8        # prevent infinite loops
     AGENT_VERBOSE: bool = True
 
+    # Profiling (off unless a request sends the admin header or is sampled)
+    PROFILE_ADMIN_TOKEN: str = ""       # value expected in the X-Aria-Profile header
+    PROFILE_SAMPLE_RATE: float = 0.0    # fraction of /ask requests to profile
+    PROFILE_CPU_SAMPLING: bool = False  # also capture a CPU profile for sampled requests
+    PROFILE_CPU_INTERVAL_MS: int = 5
+    PROFILE_BUFFER_SIZE: int = 50       # traces kept in memory
+
+    # Background jobs
+    JOBS_DB_PATH: str = "/tmp/agent_jobs/jobs.sqlite3"
+    JOB_WORKERS: int = 2                # concurrent batches
+    JOB_BATCH_SIZE: int = 4             # documents per batched Gemini call
+    JOB_REQUESTS_PER_MINUTE: int = 15   # match your Gemini quota; 0 = unlimited
+    JOB_MAX_ATTEMPTS: int = 3           # retries for quota-limited items
+    JOB_MAX_FILES: int = 500
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,9 @@
+"""
+Shared error classification for Gemini calls.
+"""
+
+
+def is_quota_error(exc: BaseException) -> bool:
+    """True if `exc` is Gemini reporting an exhausted quota or rate limit (HTTP 429)."""
+    msg = str(exc).lower()
+    return "resourceexhausted" in msg or "quota exceeded" in msg or "429" in msg
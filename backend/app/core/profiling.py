@@ -0,0 +1,317 @@
+"""
+On-demand request profiling.
+A request is profiled when it carries the admin profiling header or is
+picked by PROFILE_SAMPLE_RATE. Profiled requests record a span tree
+(agent iteration → prompt / LLM / parse, tool calls) through a LangChain
+callback handler and, optionally, a sampling CPU profile of the request
+thread. Finished traces live in a bounded ring buffer and are exported in
+the Chrome Trace Event format (loadable in Perfetto or chrome://tracing).
+Unprofiled requests never touch this module beyond `should_profile`.
+"""
+import os
+import sys
+import hmac
+import time
+import uuid
+import random
+import threading
+from collections import deque
+from typing import Any, Optional
+from uuid import UUID
+
+from langchain.callbacks.base import BaseCallbackHandler
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+MAX_STACK_DEPTH = 64
+
+
+def _now_us() -> float:
+    return time.perf_counter_ns() / 1000
+
+
+class Span:
+    def __init__(self, name: str, category: str, parent: Optional["Span"] = None, args: dict | None = None):
+        self.name = name
+        self.category = category
+        self.parent = parent
+        self.args = args or {}
+        self.children: list["Span"] = []
+        self.tid = threading.get_ident()
+        self.start_us = _now_us()
+        self.end_us: float | None = None
+        if parent is not None:
+            parent.children.append(self)
+
+    def finish(self, error: BaseException | None = None) -> None:
+        if self.end_us is None:
+            self.end_us = _now_us()
+        if error is not None:
+            self.args["error"] = f"{type(error).__name__}: {str(error)[:200]}"
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_us if self.end_us is not None else _now_us()
+        return (end - self.start_us) / 1000
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "category": self.category,
+            "duration_ms": round(self.duration_ms, 3),
+            "args": self.args,
+            "children": [c.to_dict() for c in self.children],
+        }
+
+
+class CpuSampler:
+    """Periodically samples the Python stack of a single thread."""
+
+    def __init__(self, thread_id: int, interval_ms: int):
+        self.thread_id = thread_id
+        self.interval = max(interval_ms, 1) / 1000
+        self.stack_frames: dict[str, dict] = {}
+        self.samples: list[dict] = []
+        self._frame_ids: dict[tuple, str] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="aria-cpu-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _frame_id(self, key: tuple, parent_id: str | None) -> str:
+        frame_id = self._frame_ids.get(key)
+        if frame_id is None:
+            frame_id = str(len(self._frame_ids) + 1)
+            self._frame_ids[key] = frame_id
+            filename, lineno, func = key[-1]
+            entry = {"name": f"{func} ({os.path.basename(filename)}:{lineno})", "category": "python"}
+            if parent_id is not None:
+                entry["parent"] = parent_id
+            self.stack_frames[frame_id] = entry
+        return frame_id
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                code = frame.f_code
+                stack.append((code.co_filename, frame.f_lineno, code.co_name))
+                frame = frame.f_back
+            stack.reverse()
+
+            parent_id = None
+            for depth in range(len(stack)):
+                parent_id = self._frame_id(tuple(stack[: depth + 1]), parent_id)
+            self.samples.append(
+                {"cpu": 0, "tid": self.thread_id, "ts": _now_us(), "name": "cpu", "sf": parent_id, "weight": 1}
+            )
+
+
+class Trace:
+    def __init__(self, name: str, args: dict | None = None, cpu_profile: bool = False):
+        self.trace_id = uuid.uuid4().hex
+        self.created_at = time.time()
+        self.root = Span(name, "request", args=args)
+        self.sampler = CpuSampler(self.root.tid, settings.PROFILE_CPU_INTERVAL_MS) if cpu_profile else None
+        self._lock = threading.Lock()
+        self._runs: dict[UUID, Span] = {}
+        self._iterations = 0
+        self._last_iteration: Span | None = None
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────────
+    def start(self) -> "Trace":
+        if self.sampler is not None:
+            self.sampler.start()
+        return self
+
+    def finish(self, error: BaseException | None = None) -> None:
+        if self.sampler is not None:
+            self.sampler.stop()
+        self.root.finish(error)
+
+    # ── Span bookkeeping (called from the callback handler) ───────────────────
+    def open_span(self, run_id: UUID, parent_run_id: UUID | None, name: str, category: str, args: dict | None = None) -> None:
+        with self._lock:
+            parent = self._runs.get(parent_run_id, self.root) if parent_run_id else self.root
+            if category == "chain" and parent.category == "agent":
+                self._iterations += 1
+                category = "iteration"
+                name = f"agent_iteration #{self._iterations}"
+            elif category == "tool" and parent.category == "agent" and self._last_iteration is not None:
+                # The executor runs the tool after the planning step ends; it belongs to that iteration
+                parent = self._last_iteration
+            span = Span(name, category, parent, args)
+            if category == "iteration":
+                self._last_iteration = span
+            self._runs[run_id] = span
+
+    def close_span(self, run_id: UUID, error: BaseException | None = None, args: dict | None = None) -> None:
+        with self._lock:
+            span = self._runs.pop(run_id, None)
+        if span is not None:
+            if args:
+                span.args.update(args)
+            span.finish(error)
+            # Stretch an already-closed iteration over the tool call nested in it
+            parent = span.parent
+            if parent is not None and parent.category == "iteration" and parent.end_us is not None:
+                parent.end_us = max(parent.end_us, span.end_us)
+
+    # ── Export ────────────────────────────────────────────────────────────────
+    def summary(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "created_at": self.created_at,
+            "duration_ms": round(self.root.duration_ms, 3),
+            "cpu_profile": self.sampler is not None,
+            "args": self.root.args,
+        }
+
+    def to_chrome_trace(self) -> dict:
+        pid = os.getpid()
+        events = []
+
+        def walk(span: Span) -> None:
+            end = span.end_us if span.end_us is not None else _now_us()
+            events.append({
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": span.start_us,
+                "dur": end - span.start_us,
+                "pid": pid,
+                "tid": span.tid,
+                "args": span.args,
+            })
+            for child in span.children:
+                walk(child)
+
+        walk(self.root)
+        trace = {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"trace_id": self.trace_id, "created_at": self.created_at},
+        }
+        if self.sampler is not None:
+            for sample in self.sampler.samples:
+                sample["pid"] = pid
+            trace["stackFrames"] = self.sampler.stack_frames
+            trace["samples"] = self.sampler.samples
+        return trace
+
+
+class ProfilingCallbackHandler(BaseCallbackHandler):
+    """Turns LangChain run events into spans on a Trace."""
+
+    raise_error = False
+
+    def __init__(self, trace: Trace):
+        self.trace = trace
+
+    @staticmethod
+    def _name(serialized: dict | None, kwargs: dict, default: str) -> str:
+        if kwargs.get("name"):
+            return kwargs["name"]
+        if serialized:
+            if serialized.get("name"):
+                return serialized["name"]
+            if serialized.get("id"):
+                return serialized["id"][-1]
+        return default
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs: Any) -> None:
+        name = self._name(serialized, kwargs, "chain")
+        if name == "AgentExecutor":
+            category = "agent"
+        elif "Parser" in name:
+            category = "parse"
+        elif "PromptTemplate" in name:
+            category = "prompt"
+        else:
+            category = "chain"
+        self.trace.open_span(run_id, parent_run_id, name, category)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs: Any) -> None:
+        self.trace.close_span(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs: Any) -> None:
+        self.trace.close_span(run_id, error)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs: Any) -> None:
+        model = (kwargs.get("invocation_params") or {}).get("model", "")
+        self.trace.open_span(run_id, parent_run_id, self._name(serialized, kwargs, "llm"), "llm", {"model": model})
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs: Any) -> None:
+        self.on_llm_start(serialized, [], run_id=run_id, parent_run_id=parent_run_id, **kwargs)
+
+    def on_llm_end(self, response, *, run_id, **kwargs: Any) -> None:
+        usage = (response.llm_output or {}).get("token_usage") if response else None
+        self.trace.close_span(run_id, args={"token_usage": usage} if usage else None)
+
+    def on_llm_error(self, error, *, run_id, **kwargs: Any) -> None:
+        self.trace.close_span(run_id, error)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs: Any) -> None:
+        name = self._name(serialized, kwargs, "tool")
+        self.trace.open_span(run_id, parent_run_id, f"tool:{name}", "tool", {"input": str(input_str)[:200]})
+
+    def on_tool_end(self, output, *, run_id, **kwargs: Any) -> None:
+        self.trace.close_span(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs: Any) -> None:
+        self.trace.close_span(run_id, error)
+
+
+class TraceStore:
+    """Bounded in-memory ring buffer of finished traces."""
+
+    def __init__(self, maxlen: int):
+        self._traces: deque[Trace] = deque(maxlen=max(maxlen, 1))
+        self._lock = threading.Lock()
+
+    def add(self, trace: Trace) -> None:
+        with self._lock:
+            self._traces.append(trace)
+
+    def get(self, trace_id: str) -> Trace | None:
+        with self._lock:
+            for trace in self._traces:
+                if trace.trace_id == trace_id:
+                    return trace
+        return None
+
+    def list(self) -> list[dict]:
+        with self._lock:
+            traces = list(self._traces)
+        return [t.summary() for t in reversed(traces)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._traces.clear()
+
+
+trace_store = TraceStore(settings.PROFILE_BUFFER_SIZE)
+
+
+def is_admin(token: str | None) -> bool:
+    if not settings.PROFILE_ADMIN_TOKEN or token is None:
+        return False
+    return hmac.compare_digest(token.encode(), settings.PROFILE_ADMIN_TOKEN.encode())
+
+
+def should_profile(token: str | None) -> bool:
+    if is_admin(token):
+        return True
+    rate = settings.PROFILE_SAMPLE_RATE
+    return rate > 0 and random.random() < rate
@@ -0,0 +1,148 @@
+"""
+Job Store — durable state for background jobs in a local SQLite file.
+A job is a list of items (one per file); items move
+pending → running → done | failed. Job status is derived from its items,
+so it can never drift out of sync. Items left `running` by a crash are
+re-queued on startup.
+"""
+import os
+import time
+import uuid
+import sqlite3
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id         TEXT PRIMARY KEY,
+    kind       TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_items (
+    id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id     TEXT NOT NULL REFERENCES jobs(id),
+    filename   TEXT NOT NULL,
+    status     TEXT NOT NULL DEFAULT 'pending',
+    attempts   INTEGER NOT NULL DEFAULT 0,
+    result     TEXT,
+    error      TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_job_items_status ON job_items(status, id);
+CREATE INDEX IF NOT EXISTS idx_job_items_job ON job_items(job_id);
+"""
+
+
+class JobStore:
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per operation keeps the store thread-safe
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    # ── Writes ────────────────────────────────────────────────────────────────
+    def create_job(self, kind: str, filenames: list[str]) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("INSERT INTO jobs (id, kind, created_at) VALUES (?, ?, ?)", (job_id, kind, now))
+            conn.executemany(
+                "INSERT INTO job_items (job_id, filename, updated_at) VALUES (?, ?, ?)",
+                [(job_id, name, now) for name in filenames],
+            )
+            conn.execute("COMMIT")
+        return job_id
+
+    def claim_items(self, limit: int) -> list[dict]:
+        """Atomically move up to `limit` of the oldest pending items to running."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT id, job_id, filename, attempts FROM job_items "
+                "WHERE status = 'pending' ORDER BY id LIMIT ?",
+                (limit,),
+            ).fetchall()
+            if rows:
+                conn.executemany(
+                    "UPDATE job_items SET status = 'running', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    [(time.time(), r["id"]) for r in rows],
+                )
+            conn.execute("COMMIT")
+        return [{**dict(r), "attempts": r["attempts"] + 1} for r in rows]
+
+    def _finish_item(self, item_id: int, status: str, result: str | None = None, error: str | None = None) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE job_items SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, result, error, time.time(), item_id),
+            )
+
+    def complete_item(self, item_id: int, result: str) -> None:
+        self._finish_item(item_id, "done", result=result)
+
+    def fail_item(self, item_id: int, error: str) -> None:
+        self._finish_item(item_id, "failed", error=error)
+
+    def fail_running_items(self, item_ids: list[int], error: str) -> None:
+        """Fail the given items, leaving any that already finished untouched."""
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE job_items SET status = 'failed', error = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'running'",
+                [(error, time.time(), item_id) for item_id in item_ids],
+            )
+
+    def requeue_item(self, item_id: int, error: str) -> None:
+        self._finish_item(item_id, "pending", error=error)
+
+    def requeue_running(self) -> int:
+        """Put items interrupted by a restart back in the queue."""
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE job_items SET status = 'pending', updated_at = ? WHERE status = 'running'",
+                (time.time(),),
+            )
+            return cur.rowcount
+
+    # ── Reads ─────────────────────────────────────────────────────────────────
+    def get_job(self, job_id: str) -> dict | None:
+        with self._connect() as conn:
+            job = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            items = conn.execute(
+                "SELECT filename, status, attempts, result, error, updated_at "
+                "FROM job_items WHERE job_id = ? ORDER BY id",
+                (job_id,),
+            ).fetchall()
+
+        counts = {"pending": 0, "running": 0, "done": 0, "failed": 0}
+        for item in items:
+            counts[item["status"]] += 1
+
+        if counts["pending"] + counts["running"] == 0:
+            status = "completed"
+        elif counts["pending"] == len(items):
+            status = "queued"
+        else:
+            status = "running"
+
+        return {
+            "job_id": job["id"],
+            "kind": job["kind"],
+            "status": status,
+            "created_at": job["created_at"],
+            "progress": {"total": len(items), **counts},
+            "items": [dict(item) for item in items],
+        }
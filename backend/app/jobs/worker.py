@@ -0,0 +1,182 @@
+"""
+Job Worker — bounded pool that drains summarization jobs from the JobStore.
+Each worker claims a batch of pending items, extracts their text and sends
+the prompts to Gemini in one batched call. A shared rate limiter caps LLM
+requests per minute, so throughput follows the Gemini quota rather than
+HTTP request lifetimes. Quota errors re-queue the item and pause every
+worker for QUOTA_BACKOFF_SECONDS.
+"""
+import time
+import logging
+import threading
+from collections import deque
+from typing import Callable
+
+from langchain.schema import HumanMessage
+
+from app.core.config import get_settings
+from app.core.errors import is_quota_error
+from app.jobs.store import JobStore
+from app.tools.doc_summarizer import load_document, summary_prompt, summary_llm
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+POLL_SECONDS = 1.0
+ERROR_BACKOFF_SECONDS = 1.0
+QUOTA_BACKOFF_SECONDS = 30.0
+
+# texts -> one summary string or Exception per text, in order
+BatchSummarizer = Callable[[list[str]], list]
+
+
+def gemini_summarize_batch(texts: list[str]) -> list:
+    llm = summary_llm()
+    prompts = [[HumanMessage(content=summary_prompt(t))] for t in texts]
+    responses = llm.batch(prompts, config={"max_concurrency": len(prompts)}, return_exceptions=True)
+    return [r if isinstance(r, Exception) else r.content for r in responses]
+
+
+class RateLimiter:
+    """Sliding one-minute window plus a quota backoff, shared by all workers."""
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self.pause_until = 0.0
+        self._calls: deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """Hold every worker back, e.g. after Gemini answers 429."""
+        with self._lock:
+            self.pause_until = max(self.pause_until, time.monotonic() + seconds)
+
+    def wait_resumed(self, stop: threading.Event) -> bool:
+        """Block while paused; False if stopped while waiting."""
+        while not stop.is_set():
+            remaining = self.pause_until - time.monotonic()
+            if remaining <= 0:
+                return True
+            stop.wait(remaining)
+        return False
+
+    def acquire(self, n: int, stop: threading.Event) -> bool:
+        """Block until `n` calls fit in the window; False if stopped while waiting."""
+        if 0 < self.per_minute < n:
+            raise ValueError(f"Cannot send {n} requests under a limit of {self.per_minute}/min")
+        while self.wait_resumed(stop):
+            if self.per_minute <= 0:
+                return True
+            with self._lock:
+                now = time.monotonic()
+                if now < self.pause_until:
+                    continue
+                while self._calls and now - self._calls[0] >= 60:
+                    self._calls.popleft()
+                if len(self._calls) + n <= self.per_minute:
+                    self._calls.extend([now] * n)
+                    return True
+                wait = 60 - (now - self._calls[0])
+            stop.wait(wait)
+        return False
+
+
+class JobRunner:
+    def __init__(
+        self,
+        store: JobStore,
+        summarize_batch: BatchSummarizer = gemini_summarize_batch,
+        workers: int = settings.JOB_WORKERS,
+        batch_size: int = settings.JOB_BATCH_SIZE,
+        requests_per_minute: int = settings.JOB_REQUESTS_PER_MINUTE,
+        max_attempts: int = settings.JOB_MAX_ATTEMPTS,
+    ):
+        self.store = store
+        self.summarize_batch = summarize_batch
+        self.workers = workers
+        self.batch_size = max(batch_size, 1)
+        if 0 < requests_per_minute < self.batch_size:
+            logger.warning(
+                "JOB_BATCH_SIZE=%d exceeds JOB_REQUESTS_PER_MINUTE=%d; clamping the batch size",
+                self.batch_size, requests_per_minute,
+            )
+            self.batch_size = requests_per_minute
+        self.max_attempts = max_attempts
+        self.limiter = RateLimiter(requests_per_minute)
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        requeued = self.store.requeue_running()
+        if requeued:
+            logger.info("Re-queued %d job items interrupted by a restart", requeued)
+        self._stop.clear()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._loop, name=f"job-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        for t in self._threads:
+            t.join()
+        self._threads.clear()
+
+    def notify(self) -> None:
+        """Wake idle workers after new work is queued."""
+        self._wake.set()
+
+    def _loop(self) -> None:
+        while self.limiter.wait_resumed(self._stop):
+            try:
+                items = self.store.claim_items(self.batch_size)
+                if not items:
+                    self._wake.wait(POLL_SECONDS)
+                    self._wake.clear()
+                    continue
+                self.run_batch(items)
+            except Exception:
+                # e.g. "database is locked" or a full disk; nothing restarts a dead worker
+                logger.exception("Job worker iteration failed; retrying")
+                self._stop.wait(ERROR_BACKOFF_SECONDS)
+
+    def run_batch(self, items: list[dict]) -> None:
+        try:
+            self.process(items)
+        except Exception as e:
+            logger.exception("Job batch failed")
+            # Items the batch already completed keep their results
+            self.store.fail_running_items([item["id"] for item in items], f"Worker error: {e}")
+
+    def process(self, items: list[dict]) -> None:
+        ready, texts = [], []
+        for item in items:
+            try:
+                texts.append(load_document(item["filename"]))
+                ready.append(item)
+            except (FileNotFoundError, ValueError) as e:
+                self.store.fail_item(item["id"], str(e))
+        if not ready:
+            return
+
+        if not self.limiter.acquire(len(ready), self._stop):
+            for item in ready:
+                self.store.requeue_item(item["id"], "Interrupted by shutdown.")
+            return
+
+        results = self.summarize_batch(texts)
+
+        quota_hit = False
+        for item, result in zip(ready, results):
+            if not isinstance(result, Exception):
+                self.store.complete_item(item["id"], result)
+            elif is_quota_error(result) and item["attempts"] < self.max_attempts:
+                quota_hit = True
+                self.store.requeue_item(item["id"], f"Gemini quota exceeded; retrying: {result}")
+            else:
+                self.store.fail_item(item["id"], f"{type(result).__name__}: {result}")
+
+        if quota_hit:
+            self.limiter.pause(QUOTA_BACKOFF_SECONDS)
@@ -3,28 +3,48 @@ FastAPI Application — LLM Agent
 Routes:
   POST /ask             — run the agent
   POST /upload          — upload a file for summarization
+  POST /jobs/summarize  — queue a bulk summarization job
+  GET  /jobs/{id}       — job progress and results
   DELETE /session/{id}  — clear session memory
   GET  /tools           — list available tools
+  GET  /search/backends — web search backend latency / error stats
+  GET  /traces          — list recent request profiles
+  GET  /traces/{id}     — one profile in Chrome Trace Event format
   GET  /health
 """
 import os
 import uuid
 import shutil
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Header
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 from app.core.config import get_settings
+from app.core import profiling
+from app.core.errors import is_quota_error
 from app.agent.react_agent import run_agent, clear_memory, ALL_TOOLS
+from app.tools.search_backends import search_router
+from app.jobs.store import JobStore
+from app.jobs.worker import JobRunner
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    job_runner.start()
+    yield
+    job_runner.stop()
+
+
 app = FastAPI(
     title="Aria — LLM Agent API",
     description="General-purpose ReAct agent powered by Gemini",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -38,6 +58,9 @@ app.add_middleware(
 UPLOAD_DIR = "/tmp/agent_uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+job_store = JobStore(settings.JOBS_DB_PATH)
+job_runner = JobRunner(job_store)
+
 
 # ── Schemas ───────────────────────────────────────────────────────────────────
 class AskRequest(BaseModel):
@@ -56,6 +79,11 @@ class AskResponse(BaseModel):
     steps: List[AgentStep]
     session_id: str
     tool_count: int
+    trace_id: Optional[str] = None
+
+
+class SummarizeJobRequest(BaseModel):
+    filenames: List[str]
 
 
 # ── Routes ────────────────────────────────────────────────────────────────────
@@ -75,24 +103,44 @@ def list_tools():
     }
 
 
+@app.get("/search/backends")
+def search_backend_stats():
+    return {
+        "order": [b.name for b in search_router.ranked()],
+        "backends": search_router.stats_snapshot(),
+    }
+
+
 @app.post("/ask", response_model=AskResponse)
-def ask(req: AskRequest):
+def ask(
+    req: AskRequest,
+    x_aria_profile: Optional[str] = Header(default=None),
+    x_aria_profile_cpu: bool = Header(default=False),
+):
     """Run the ReAct agent on a question."""
     if not req.question.strip():
         raise HTTPException(400, "Question cannot be empty.")
 
     session_id = req.session_id or str(uuid.uuid4())
 
+    trace = None
+    callbacks = None
+    if profiling.should_profile(x_aria_profile):
+        cpu = settings.PROFILE_CPU_SAMPLING or (x_aria_profile_cpu and profiling.is_admin(x_aria_profile))
+        trace = profiling.Trace(
+            "ask",
+            args={"session_id": session_id, "question": req.question[:200]},
+            cpu_profile=cpu,
+        ).start()
+        callbacks = [profiling.ProfilingCallbackHandler(trace)]
+
     try:
-        result = run_agent(req.question, session_id)
+        result = run_agent(req.question, session_id, callbacks=callbacks)
     except Exception as e:
-        err = str(e)
-        lowered = err.lower()
-        if (
-            "resourceexhausted" in lowered
-            or "quota exceeded" in lowered
-            or "429" in lowered
-        ):
+        if trace is not None:
+            trace.finish(e)
+            profiling.trace_store.add(trace)
+        if is_quota_error(e):
             raise HTTPException(
                 status_code=429,
                 detail=(
@@ -101,11 +149,38 @@ def ask(req: AskRequest):
                     "then retry."
                 ),
             )
-        raise HTTPException(500, f"Agent error: {err}")
+        raise HTTPException(500, f"Agent error: {e}")
+
+    if trace is not None:
+        trace.finish()
+        profiling.trace_store.add(trace)
+        result["trace_id"] = trace.trace_id
 
     return AskResponse(**result)
 
 
+def _require_profile_admin(token: Optional[str]) -> None:
+    # Traces hold user questions and tool inputs: never serve them without a token
+    if not profiling.is_admin(token):
+        raise HTTPException(403, "Profiling admin token required.")
+
+
+@app.get("/traces")
+def list_traces(x_aria_profile: Optional[str] = Header(default=None)):
+    _require_profile_admin(x_aria_profile)
+    return {"traces": profiling.trace_store.list()}
+
+
+@app.get("/traces/{trace_id}")
+def get_trace(trace_id: str, x_aria_profile: Optional[str] = Header(default=None)):
+    """Chrome Trace Event JSON — open in ui.perfetto.dev or chrome://tracing."""
+    _require_profile_admin(x_aria_profile)
+    trace = profiling.trace_store.get(trace_id)
+    if trace is None:
+        raise HTTPException(404, f"Trace {trace_id} not found.")
+    return trace.to_chrome_trace()
+
+
 @app.post("/upload")
 async def upload_file(file: UploadFile = File(...)):
     """Upload a PDF, DOCX, or TXT for the summarize_document tool."""
@@ -121,6 +196,35 @@ async def upload_file(file: UploadFile = File(...)):
     return {"filename": file.filename, "status": "uploaded", "message": f"You can now ask me to summarize '{file.filename}'"}
 
 
+@app.post("/jobs/summarize", status_code=202)
+def create_summarize_job(req: SummarizeJobRequest):
+    """Queue uploaded files for background summarization."""
+    filenames = list(dict.fromkeys(req.filenames))
+    if not filenames:
+        raise HTTPException(400, "Provide at least one filename.")
+    if len(filenames) > settings.JOB_MAX_FILES:
+        raise HTTPException(400, f"At most {settings.JOB_MAX_FILES} files per job.")
+
+    missing = [
+        name for name in filenames
+        if os.path.basename(name) != name or not os.path.isfile(os.path.join(UPLOAD_DIR, name))
+    ]
+    if missing:
+        raise HTTPException(400, f"Files not found in uploads: {missing}")
+
+    job_id = job_store.create_job("summarize", filenames)
+    job_runner.notify()
+    return {"job_id": job_id, "status": "queued", "total": len(filenames)}
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = job_store.get_job(job_id)
+    if job is None:
+        raise HTTPException(404, f"Job {job_id} not found.")
+    return job
+
+
 @app.delete("/session/{session_id}")
 def clear_session(session_id: str):
     clear_memory(session_id)
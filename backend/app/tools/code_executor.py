@@ -1,26 +1,520 @@
 """
 Tool 4 — Safe Code Execution
 Runs Python code in a restricted sandbox using RestrictedPython.
-Supports: math, statistics, string ops, list comprehensions.
-Blocks: file I/O, network calls, os/subprocess, imports of dangerous modules.
+Supports: math, statistics, a curated NumPy subset, string ops, list comprehensions.
+Blocks: file I/O, network calls, os/subprocess, imports of dangerous modules,
+NumPy file/IO and ctypes entry points, and arrays above the size caps.
 """
 import io
+import builtins
 import sys
 import math
+import operator
+import warnings
 import statistics
+from collections.abc import Sized
+from types import ModuleType
+
+import numpy
 from langchain.tools import tool
 from RestrictedPython import compile_restricted, safe_globals, safe_builtins
-from RestrictedPython.Guards import guarded_iter_unpack_sequence
+from RestrictedPython.Guards import (
+    full_write_guard,
+    guarded_iter_unpack_sequence,
+    guarded_unpack_sequence,
+    safer_getattr,
+)
+
+
+# ── Limits ────────────────────────────────────────────────────────────────────
+MAX_ARRAY_ELEMENTS = 5_000_000       # per array
+MAX_ARRAY_BYTES = 64 * 1024 * 1024   # per array
+SUMMARY_THRESHOLD = 100              # arrays larger than this are summarized
+MAX_OUTPUT_CHARS = 4000
+
+
+class ArrayLimitError(Exception):
+    pass
+
+
+# ── Curated NumPy ─────────────────────────────────────────────────────────────
+NUMPY_FUNCTIONS = {
+    # construction
+    "array", "asarray", "arange", "linspace", "logspace", "zeros", "ones", "full",
+    "zeros_like", "ones_like", "full_like", "eye", "identity", "diag", "tile",
+    "repeat", "meshgrid",
+    # shape & selection
+    "reshape", "ravel", "transpose", "concatenate", "stack", "vstack", "hstack",
+    "column_stack", "split", "squeeze", "expand_dims", "flip", "sort", "argsort",
+    "unique", "where", "clip", "round", "cumsum", "cumprod", "diff", "convolve",
+    "correlate", "histogram", "digitize", "searchsorted", "isnan", "isfinite",
+    "nan_to_num", "count_nonzero", "nonzero", "argmax", "argmin", "all", "any",
+    # math
+    "abs", "absolute", "sqrt", "exp", "log", "log2", "log10", "sin", "cos", "tan",
+    "arcsin", "arccos", "arctan", "arctan2", "sinh", "cosh", "tanh", "floor",
+    "ceil", "power", "mod", "sign", "maximum", "minimum", "add", "subtract",
+    "multiply", "divide", "dot", "matmul", "inner", "outer", "cross", "trace",
+    "interp", "gradient", "trapz", "polyfit", "polyval", "isclose", "allclose",
+    "array_equal",
+    # statistics
+    "sum", "prod", "mean", "median", "average", "std", "var", "min", "max",
+    "amin", "amax", "ptp", "percentile", "quantile", "corrcoef", "cov",
+    "nansum", "nanmean", "nanmedian", "nanstd", "nanvar", "nanmin", "nanmax",
+    "nanpercentile",
+}
+NUMPY_VALUES = {
+    "pi", "e", "inf", "nan", "newaxis",
+    "float64", "float32", "int64", "int32", "bool_",
+}
+NUMPY_LINALG = {
+    "inv", "pinv", "det", "solve", "lstsq", "eig", "eigvals", "eigh", "svd",
+    "qr", "cholesky", "norm", "matrix_rank",
+}
+NUMPY_RANDOM = {
+    "default_rng", "seed", "rand", "randn", "randint", "random", "normal",
+    "uniform", "choice", "shuffle", "permutation",
+}
+
+# Generator methods reachable from np.random.default_rng()
+GENERATOR_METHODS = {
+    "random", "integers", "normal", "standard_normal", "uniform", "choice",
+    "shuffle", "permutation", "exponential", "poisson", "binomial",
+}
+
+# Attributes of any NumPy object that reach raw memory, the filesystem or pickle
+BLOCKED_NUMPY_ATTRS = {
+    "ctypes", "cffi", "capsule", "bit_generator", "state", "lock", "data",
+    "tofile", "dump", "dumps", "resize", "base", "setflags",
+}
+
+# Positional index of the `dtype` argument; array methods count the array as arg 0
+_DTYPE_ARG = {
+    "zeros": 1, "ones": 1, "full": 2, "array": 1, "asarray": 1, "arange": 3,
+    "linspace": 5, "logspace": 5, "eye": 3, "identity": 1, "zeros_like": 1,
+    "ones_like": 1, "full_like": 2, "astype": 1, "view": 1,
+}
+
+# Positional index of the `size` argument for random constructors
+_SIZE_ARG = {
+    "randint": 2, "normal": 2, "uniform": 2, "choice": 1, "random": 0, "integers": 2,
+    "standard_normal": 0, "exponential": 1, "poisson": 1, "binomial": 2,
+}
+
+
+def _shape(x) -> tuple:
+    """Shape of an array-like, read without converting (and so copying) it."""
+    shape = getattr(x, "shape", None)
+    if isinstance(shape, tuple):
+        return shape
+    if isinstance(x, (str, bytes)):
+        return ()
+    if isinstance(x, (list, tuple)):
+        return (len(x),) + (_shape(x[0]) if x else ())
+    if isinstance(x, Sized):   # range and other sized iterables
+        return (len(x),)
+    return ()
+
+
+def _size(x) -> int:
+    return math.prod(_shape(x))
+
+
+def _count(shape) -> int:
+    if isinstance(shape, (int, numpy.integer)):
+        return int(shape)
+    return math.prod(int(d) for d in shape)
+
+
+def _broadcast_elements(args) -> int:
+    """Size of the broadcast of all array-like args (elementwise results)."""
+    shapes = [_shape(a) for a in args]
+    try:
+        return math.prod(numpy.broadcast_shapes(*shapes))
+    except ValueError:
+        return sum(math.prod(s) for s in shapes)
+
+
+def _product_elements(name: str, a: tuple, b: tuple) -> int:
+    """Result size of matmul / dot / inner for operand shapes `a` and `b`."""
+    if not a or not b:
+        return max(math.prod(a), math.prod(b))
+    if name == "inner":
+        return math.prod(a[:-1]) * math.prod(b[:-1])
+    if name == "dot":
+        return math.prod(a[:-1]) * (math.prod(b[:-2]) * b[-1] if len(b) > 1 else 1)
+    # matmul: 1-D operands are promoted to matrices and batch dims broadcast
+    a = a if len(a) > 1 else (1,) + a
+    b = b if len(b) > 1 else b + (1,)
+    try:
+        batch = math.prod(numpy.broadcast_shapes(a[:-2], b[:-2]))
+    except ValueError:
+        return 0   # NumPy raises the shape error itself
+    return batch * a[-2] * b[-1]
+
+
+def _is_bool_index(k) -> bool:
+    if isinstance(k, numpy.ndarray):
+        return k.dtype == bool
+    while isinstance(k, list) and k:
+        k = k[0]
+    return isinstance(k, (bool, numpy.bool_))
+
+
+def _index_elements(shape: tuple, key) -> int:
+    """Size of a[key] under advanced indexing; 0 for basic indexing (a view)."""
+    key = key if isinstance(key, tuple) else (key,)
+    if not any(isinstance(k, (list, numpy.ndarray)) for k in key):
+        return 0
+    consumed = sum(
+        len(_shape(k)) if _is_bool_index(k) else 1
+        for k in key if k is not None and k is not Ellipsis
+    )
+    kept, advanced, dim = 1, [], 0
+    for k in key:
+        if k is None:
+            continue
+        if k is Ellipsis:
+            skip = max(len(shape) - consumed, 0)
+            kept *= math.prod(shape[dim:dim + skip])
+            dim += skip
+        elif isinstance(k, (list, numpy.ndarray)):
+            if _is_bool_index(k):
+                advanced.append((int(numpy.count_nonzero(k)),))
+                dim += len(_shape(k))
+            else:
+                advanced.append(_shape(k))
+                dim += 1
+        elif isinstance(k, slice):
+            if dim < len(shape):
+                kept *= len(range(*k.indices(shape[dim])))
+            dim += 1
+        else:
+            dim += 1
+    kept *= math.prod(shape[dim:])
+    try:
+        return kept * math.prod(numpy.broadcast_shapes(*advanced))
+    except ValueError:
+        return 0   # NumPy raises the IndexError itself
+
+
+def _requested_elements(name: str, args: tuple, kwargs: dict) -> int:
+    """Element count of the largest array a call will allocate, computed before it runs."""
+    if name in ("zeros", "ones", "full"):
+        return _count(kwargs.get("shape", args[0] if args else 0))
+    if name in ("zeros_like", "ones_like", "full_like") and kwargs.get("shape") is not None:
+        return _count(kwargs["shape"])
+    if name == "eye":
+        n = kwargs.get("N", args[0] if args else 0)
+        m = kwargs.get("M", args[1] if len(args) > 1 else None)
+        return int(n) * int(m if m is not None else n)
+    if name == "identity":
+        return int(args[0]) ** 2 if args else 0
+    if name == "arange":
+        start, stop, step = 0, None, 1
+        if len(args) == 1:
+            stop = args[0]
+        elif args:
+            start, stop = args[0], args[1]
+            step = args[2] if len(args) > 2 else kwargs.get("step", 1)
+        stop = kwargs.get("stop", stop)
+        return max(0, math.ceil((stop - start) / step)) if stop is not None and step else 0
+    if name in ("linspace", "logspace"):
+        return int(kwargs.get("num", args[2] if len(args) > 2 else 50))
+    if name in ("rand", "randn"):
+        return _count(args) if args else 1
+    if name == "tile" and len(args) > 1:
+        return _size(args[0]) * _count(args[1])
+    if name == "repeat" and len(args) > 1:
+        repeats = args[1]
+        most = int(numpy.max(repeats)) if _size(repeats) else 0
+        return _size(args[0]) * most
+    if name == "take" and len(args) > 1:
+        axis = kwargs.get("axis", args[2] if len(args) > 2 else None)
+        shape = _shape(args[0])
+        rest = math.prod(shape) // shape[axis] if axis is not None and shape and shape[axis] else 1
+        return _size(args[1]) * rest
+    if name == "outer" and len(args) > 1:
+        return _size(args[0]) * _size(args[1])
+    if name in ("matmul", "dot", "inner") and len(args) > 1:
+        return _product_elements(name, _shape(args[0]), _shape(args[1]))
+    if name == "diag" and args and len(_shape(args[0])) == 1:
+        n = _shape(args[0])[0] + abs(int(kwargs.get("k", args[1] if len(args) > 1 else 0)))
+        return n * n
+    if name == "meshgrid":
+        return len(args) * math.prod(_size(x) for x in args)
+    if name in ("concatenate", "stack", "vstack", "hstack", "column_stack") and args:
+        return sum(_size(x) for x in args[0])
+    if name == "histogram" and args:
+        bins = kwargs.get("bins", args[1] if len(args) > 1 else 10)
+        if isinstance(bins, (int, numpy.integer)):
+            return max(_size(args[0]), int(bins) + 1)
+    if name in ("cov", "corrcoef") and args:
+        rowvar = kwargs.get("rowvar", True)
+
+        def variables(x) -> int:
+            shape = _shape(x)
+            return 1 if len(shape) < 2 else (shape[0] if rowvar else shape[1])
+
+        y = kwargs.get("y", args[1] if len(args) > 1 else None)
+        n = variables(args[0]) + (variables(y) if y is not None else 0)
+        return max(n * n, _size(args[0]))
+    if name in ("svd", "qr") and args and len(_shape(args[0])) >= 2:
+        *batch, m, n = _shape(args[0])
+        k = min(m, n)
+        if name == "svd":
+            full = kwargs.get("full_matrices", args[1] if len(args) > 1 else True)
+            per_matrix = m * m + n * n if full else m * k + k * n
+        else:
+            mode = kwargs.get("mode", args[1] if len(args) > 1 else "reduced")
+            per_matrix = m * m + m * n if mode == "complete" else m * k + k * n
+        return math.prod(batch) * per_matrix
+    if name in ("percentile", "quantile", "nanpercentile") and len(args) > 1:
+        shape, q = _shape(args[0]), _size(args[1])
+        axis = kwargs.get("axis", args[2] if len(args) > 2 else None)
+        if axis is None:
+            return max(math.prod(shape), q)
+        axes = axis if isinstance(axis, (tuple, list)) else (axis,)
+        reduced = math.prod(shape[i] for i in axes) or 1
+        return max(math.prod(shape), q * (math.prod(shape) // reduced))
+    if name == "permutation" and args and isinstance(args[0], (int, numpy.integer)):
+        return int(args[0])
+    size = kwargs.get("size")
+    if size is None and name in _SIZE_ARG and len(args) > _SIZE_ARG[name]:
+        size = args[_SIZE_ARG[name]]
+    if size is not None:
+        return _count(size)
+    # Everything else is elementwise or a reduction: no bigger than its broadcast inputs
+    return _broadcast_elements(args)
+
+
+def _data_itemsize(x) -> int:
+    """Largest item size NumPy will need for `x`; strings are sized by their longest member."""
+    if isinstance(x, (numpy.ndarray, numpy.generic)):
+        return x.itemsize
+    if isinstance(x, str):
+        return 4 * len(x)   # NumPy stores str as UCS-4
+    if isinstance(x, bytes):
+        return len(x)
+    if not isinstance(x, (list, tuple)):
+        return 0
+    # One C-level pass over the types keeps numeric lists cheap
+    types = set(map(type, x))
+    size = 0
+    if any(issubclass(t, (str, bytes)) for t in types):
+        size = max(_data_itemsize(v) for v in x if isinstance(v, (str, bytes)))
+    if any(issubclass(t, (list, tuple)) for t in types):
+        size = max(size, max(_data_itemsize(v) for v in x if isinstance(v, (list, tuple))))
+    return size
+
+
+def _requested_itemsize(name: str, args: tuple, kwargs: dict) -> int:
+    """Item size of the array a call will allocate, resolved before it runs."""
+    dtype = kwargs.get("dtype")
+    if dtype is None and name in _DTYPE_ARG and len(args) > _DTYPE_ARG[name]:
+        dtype = args[_DTYPE_ARG[name]]
+    if dtype is not None and not (isinstance(dtype, type) and issubclass(dtype, numpy.ndarray)):
+        dtype = numpy.dtype(dtype)
+        # Object, raw-bytes, structured and subarray dtypes (all kind "V") hide their real size
+        if dtype.kind in "OV":
+            raise ArrayLimitError(f"dtype {dtype} is not available in the sandbox")
+        if name == "view":
+            return 0   # reinterprets the same buffer
+        if dtype.itemsize:
+            return dtype.itemsize
+    data = [a for a in args if not isinstance(a, numpy.dtype)]
+    data += [v for k, v in kwargs.items() if k != "dtype"]
+    itemsize = max(map(_data_itemsize, data), default=0)
+    if dtype is not None:
+        # Unsized "U" / "S": NumPy picks the width from the data, e.g. int64 -> <U21
+        source = args[0].dtype if args and isinstance(args[0], numpy.ndarray) else numpy.dtype(float)
+        itemsize = max(itemsize, numpy.promote_types(source, dtype).itemsize)
+    return max(itemsize, 8)
+
+
+def _check_request(name: str, requested: int, itemsize: int = 0) -> None:
+    if requested > MAX_ARRAY_ELEMENTS:
+        raise ArrayLimitError(
+            f"{name} would create {requested:,} elements; "
+            f"the sandbox limit is {MAX_ARRAY_ELEMENTS:,}"
+        )
+    if requested * itemsize > MAX_ARRAY_BYTES:
+        raise ArrayLimitError(
+            f"{name} would allocate {requested * itemsize // 2**20:,} MiB; "
+            f"the sandbox limit is {MAX_ARRAY_BYTES // 2**20} MiB"
+        )
+
+
+def _plain(x):
+    return x.view(numpy.ndarray) if isinstance(x, SandboxArray) else x
+
+
+class SandboxArray(numpy.ndarray):
+    """
+    ndarray handed to sandboxed code. Operators and fancy indexing check the
+    size cap before NumPy allocates the result.
+    """
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method == "outer":
+            requested = math.prod(_size(x) for x in inputs)
+        elif method == "__call__" and ufunc.signature is None:
+            requested = _broadcast_elements(inputs)
+        elif method == "__call__" and len(inputs) == 2:
+            requested = _product_elements("matmul", _shape(inputs[0]), _shape(inputs[1]))
+        else:
+            requested = 0   # reduce / accumulate / at never outgrow their input
+        _check_request(f"{ufunc.__name__}()", requested, max(map(_data_itemsize, inputs)))
+
+        out = kwargs.get("out")
+        if out:
+            kwargs["out"] = tuple(_plain(x) for x in out)
+        results = getattr(ufunc, method)(*(_plain(x) for x in inputs), **kwargs)
+        if out:
+            return out[0] if len(out) == 1 else out
+        return _sandboxed(results)
+
+    def __getitem__(self, key):
+        if not isinstance(key, (int, slice)):
+            _check_request("indexing", _index_elements(self.shape, key), self.itemsize)
+        return super().__getitem__(key)
+
+    def __repr__(self):
+        return repr(self.view(numpy.ndarray))
+
+
+def _sandboxed(value):
+    """Check a result against the caps and hand arrays back as SandboxArray."""
+    if isinstance(value, numpy.ndarray):
+        if value.size > MAX_ARRAY_ELEMENTS or value.nbytes > MAX_ARRAY_BYTES:
+            raise ArrayLimitError(
+                f"array of shape {value.shape} exceeds the sandbox limit "
+                f"({MAX_ARRAY_ELEMENTS:,} elements / {MAX_ARRAY_BYTES // 2**20} MiB)"
+            )
+        return value if isinstance(value, SandboxArray) else value.view(SandboxArray)
+    if isinstance(value, tuple):
+        items = [_sandboxed(v) for v in value]
+        return type(value)(*items) if hasattr(value, "_fields") else tuple(items)
+    if isinstance(value, list) and value and isinstance(value[0], numpy.ndarray):
+        return [_sandboxed(v) for v in value]
+    return value
+
+
+def _guarded(fn, name: str, owner=None):
+    def call(*args, **kwargs):
+        # Array methods are sized like the function form: a.repeat(n) ≈ np.repeat(a, n)
+        sized_args = (owner, *args) if isinstance(owner, numpy.ndarray) else args
+        requested = _requested_elements(name, sized_args, kwargs)
+        _check_request(f"{name}()", requested)   # before sizing items, so the scan stays bounded
+        _check_request(f"{name}()", requested, _requested_itemsize(name, sized_args, kwargs))
+        return _sandboxed(fn(*args, **kwargs))
+
+    call.__name__ = name
+    call.__doc__ = fn.__doc__
+    return call
+
+
+def _curated_module(name: str, source, functions: set, values: set = frozenset()) -> ModuleType:
+    # Prefixed so `from numpy import x` can't fall back to the real sys.modules entry
+    mod = ModuleType(f"sandbox.{name}")
+    for attr in functions:
+        setattr(mod, attr, _guarded(getattr(source, attr), attr))
+    for attr in values:
+        setattr(mod, attr, getattr(source, attr))
+    return mod
+
+
+SAFE_NUMPY = _curated_module("numpy", numpy, NUMPY_FUNCTIONS, NUMPY_VALUES)
+SAFE_NUMPY.linalg = _curated_module("numpy.linalg", numpy.linalg, NUMPY_LINALG)
+SAFE_NUMPY.random = _curated_module("numpy.random", numpy.random, NUMPY_RANDOM)
 
 
 # Whitelist of safe modules the agent can use
 SAFE_MODULES = {
     "math": math,
     "statistics": statistics,
+    "numpy": SAFE_NUMPY,
 }
 
 BLOCKED_BUILTINS = {"open", "exec", "eval", "__import__", "compile", "input"}
 
+# Harmless builtins RestrictedPython's safe_builtins leaves out
+EXTRA_BUILTINS = {
+    name: getattr(builtins, name)
+    for name in ("list", "dict", "set", "frozenset", "sum", "min", "max",
+                 "enumerate", "any", "all", "map", "filter", "reversed")
+}
+
+INPLACE_OPS = {
+    "+=": operator.iadd, "-=": operator.isub, "*=": operator.imul,
+    "/=": operator.itruediv, "//=": operator.ifloordiv, "%=": operator.imod,
+    "**=": operator.ipow, "&=": operator.iand,
+    "|=": operator.ior, "^=": operator.ixor, "<<=": operator.ilshift,
+    ">>=": operator.irshift,
+}
+
+
+# ── RestrictedPython hooks ────────────────────────────────────────────────────
+class _StdoutPrint:
+    """`_print_` hook that sends print() to the (captured) sys.stdout."""
+
+    def __init__(self, _getattr_=None):
+        pass
+
+    def _call_print(self, *objects, **kwargs):
+        kwargs.pop("file", None)
+        print(*objects, **kwargs)
+
+    def __call__(self):
+        return ""
+
+
+def _guarded_import(name, globals=None, locals=None, fromlist=(), level=0):
+    root, _, rest = name.partition(".")
+    if level or root not in SAFE_MODULES:
+        raise ImportError(f"Import of '{name}' is not allowed in the sandbox.")
+    mod = SAFE_MODULES[root]
+    if not fromlist:
+        return mod
+    for part in rest.split(".") if rest else []:
+        mod = getattr(mod, part, None)
+        if not isinstance(mod, ModuleType):
+            raise ImportError(f"Import of '{name}' is not allowed in the sandbox.")
+    return mod
+
+
+_MISSING = object()
+
+
+def _is_numpy_object(obj) -> bool:
+    return type(obj).__module__.partition(".")[0] == "numpy" or isinstance(obj, numpy.ndarray)
+
+
+def _guarded_getattr(obj, name, default=_MISSING):
+    if _is_numpy_object(obj) and name in BLOCKED_NUMPY_ATTRS:
+        raise AttributeError(f"'{name}' is not available on NumPy objects in the sandbox.")
+    if isinstance(obj, numpy.random.Generator) and name not in GENERATOR_METHODS:
+        raise AttributeError(f"Generator.{name} is not available in the sandbox.")
+    value = safer_getattr(obj, name, _MISSING)
+    if value is _MISSING:
+        if default is _MISSING:
+            raise AttributeError(f"'{type(obj).__name__}' object has no attribute '{name}'")
+        return default
+    if callable(value) and isinstance(obj, (numpy.ndarray, numpy.random.Generator)):
+        return _guarded(value, name, owner=obj)
+    return value
+
+
+def _guarded_write(obj):
+    if isinstance(obj, numpy.ndarray):
+        return obj
+    return full_write_guard(obj)
+
+
+def _inplacevar(op, x, y):
+    if op not in INPLACE_OPS:
+        raise ValueError(f"Unsupported in-place operator: {op}")
+    return INPLACE_OPS[op](x, y)
+
 
 def _build_restricted_globals() -> dict:
     globs = safe_globals.copy()
@@ -28,24 +522,55 @@ def _build_restricted_globals() -> dict:
         k: v for k, v in safe_builtins.items()
         if k not in BLOCKED_BUILTINS
     }
+    globs["__builtins__"].update(EXTRA_BUILTINS)
+    globs["__builtins__"]["__import__"] = _guarded_import
+    globs["_print_"] = _StdoutPrint
     globs["_getiter_"] = iter
-    globs["_getattr_"] = getattr
-    globs["_inplacevar_"] = lambda op, x, y: x + y if op == "+=" else x
+    globs["_getitem_"] = operator.getitem
+    globs["_getattr_"] = _guarded_getattr
+    globs["_write_"] = _guarded_write
+    globs["_inplacevar_"] = _inplacevar
+    globs["_unpack_sequence_"] = guarded_unpack_sequence
     globs["_iter_unpack_sequence_"] = guarded_iter_unpack_sequence
 
     # Inject safe modules
     for name, mod in SAFE_MODULES.items():
         globs[name] = mod
+    globs["np"] = SAFE_NUMPY
 
     return globs
 
 
+# ── Output formatting ─────────────────────────────────────────────────────────
+def _format_value(value) -> str:
+    """Summarize large arrays instead of stringifying every element."""
+    if isinstance(value, numpy.ndarray) and value.size > SUMMARY_THRESHOLD:
+        lines = [f"ndarray shape={value.shape} dtype={value.dtype}"]
+        if value.dtype.kind in "iuf":
+            lines.append(
+                f"  min={numpy.nanmin(value):.6g} max={numpy.nanmax(value):.6g} "
+                f"mean={numpy.nanmean(value):.6g} std={numpy.nanstd(value):.6g}"
+            )
+        lines.append("  " + numpy.array2string(value, threshold=20, edgeitems=3))
+        return "\n".join(lines)
+    return str(value)
+
+
+def _truncate(output: str) -> str:
+    if len(output) <= MAX_OUTPUT_CHARS:
+        return output
+    return output[:MAX_OUTPUT_CHARS] + f"\n... [output truncated, {len(output):,} characters total]"
+
+
 @tool
 def execute_python(code: str) -> str:
     """
     Execute Python code safely in a sandbox.
     Use this for calculations, data processing, sorting, statistics,
     string manipulation, and algorithmic tasks.
+    `math`, `statistics` and a NumPy subset (`np`, incl. np.linalg and
+    np.random) are available — prefer NumPy for percentiles, matrix math,
+    moving averages and other work over large lists.
     DO NOT use for file I/O, network requests, or system calls — those are blocked.
     Input: a string of valid Python code.
     The last expression or any print() output will be returned.
@@ -55,20 +580,25 @@ def execute_python(code: str) -> str:
     sys.stdout = buffer = io.StringIO()
 
     try:
-        byte_code = compile_restricted(code, filename="<agent_code>", mode="exec")
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", SyntaxWarning)
+            byte_code = compile_restricted(code, filename="<agent_code>", mode="exec")
         globs = _build_restricted_globals()
-        locs: dict = {}
+        preset = set(globs)
 
-        exec(byte_code, globs, locs)  # noqa: S102
+        # One namespace, so functions defined by the code can see its top-level names
+        with numpy.printoptions(threshold=SUMMARY_THRESHOLD, edgeitems=3):
+            exec(byte_code, globs)  # noqa: S102
+        locs = {k: v for k, v in globs.items() if k not in preset}
 
         output = buffer.getvalue().strip()
 
         # If no print output, return the last assigned variable
         if not output and locs:
             last_var = list(locs.values())[-1]
-            output = str(last_var)
+            output = _format_value(last_var)
 
-        return output if output else "Code executed successfully (no output)."
+        return _truncate(output) if output else "Code executed successfully (no output)."
 
     except SyntaxError as e:
         return f"Syntax error in code: {e}"
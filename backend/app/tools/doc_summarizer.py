@@ -14,6 +14,7 @@ from app.core.config import get_settings
 settings = get_settings()
 
 UPLOAD_DIR = "/tmp/agent_uploads"
+MAX_CHARS = 12000
 
 
 def _extract_text(file_path: str) -> str:
@@ -33,18 +34,16 @@ def _extract_text(file_path: str) -> str:
         raise ValueError(f"Unsupported file type: {ext}")
 
 
-@tool
-def summarize_document(filename: str) -> str:
+def load_document(filename: str) -> str:
     """
-    Summarize a document that the user has uploaded.
-    Input: the filename (e.g. "report.pdf" or "notes.docx").
-    Returns a concise structured summary with key points.
+    Read an uploaded file and return its text, truncated for the LLM context.
+    Raises FileNotFoundError / ValueError with a user-facing message.
     """
     file_path = os.path.join(UPLOAD_DIR, filename)
 
     if not os.path.exists(file_path):
         available = os.listdir(UPLOAD_DIR) if os.path.exists(UPLOAD_DIR) else []
-        return (
+        raise FileNotFoundError(
             f"File '{filename}' not found in uploads.\n"
             f"Available files: {available or 'none uploaded yet'}"
         )
@@ -52,24 +51,20 @@ def summarize_document(filename: str) -> str:
     try:
         text = _extract_text(file_path)
     except Exception as e:
-        return f"Could not read file: {e}"
+        raise ValueError(f"Could not read file: {e}") from e
 
     if not text.strip():
-        return "The document appears to be empty or unreadable."
+        raise ValueError("The document appears to be empty or unreadable.")
 
     # Truncate to ~12k chars to stay within context limits
-    truncated = text[:12000]
-    if len(text) > 12000:
+    truncated = text[:MAX_CHARS]
+    if len(text) > MAX_CHARS:
         truncated += "\n\n[Document truncated — showing first 12,000 characters]"
+    return truncated
 
-    llm = ChatGoogleGenerativeAI(
-        model=settings.GEMINI_MODEL,
-        google_api_key=settings.GOOGLE_API_KEY,
-        temperature=0.1,
-        max_retries=settings.GEMINI_MAX_RETRIES,
-    )
 
-    prompt = f"""Summarize the following document. Structure your response as:
+def summary_prompt(text: str) -> str:
+    return f"""Summarize the following document. Structure your response as:
 
 **Overview** (2-3 sentences)
 
@@ -81,7 +76,30 @@ def summarize_document(filename: str) -> str:
 **Notable Details** (any important numbers, dates, names)
 
 Document:
-{truncated}
+{text}
 """
-    response = llm.invoke([HumanMessage(content=prompt)])
+
+
+def summary_llm() -> ChatGoogleGenerativeAI:
+    return ChatGoogleGenerativeAI(
+        model=settings.GEMINI_MODEL,
+        google_api_key=settings.GOOGLE_API_KEY,
+        temperature=0.1,
+        max_retries=settings.GEMINI_MAX_RETRIES,
+    )
+
+
+@tool
+def summarize_document(filename: str) -> str:
+    """
+    Summarize a document that the user has uploaded.
+    Input: the filename (e.g. "report.pdf" or "notes.docx").
+    Returns a concise structured summary with key points.
+    """
+    try:
+        text = load_document(filename)
+    except (FileNotFoundError, ValueError) as e:
+        return str(e)
+
+    response = summary_llm().invoke([HumanMessage(content=summary_prompt(text))])
     return response.content
@@ -0,0 +1,264 @@
+"""
+Search Backends — hedged, merged web search across providers.
+Backends are tried in health order: the best one starts at once, the next
+is launched after SEARCH_HEDGE_MS (or immediately if one fails). The first
+good result set wins. Others that land within SEARCH_MERGE_WINDOW_MS are
+merged into it, deduplicated by URL. Per-backend latency and error rates
+are tracked, and a backend that stays slow or failing is demoted to the
+back of the order for SEARCH_DEMOTE_SECONDS.
+
+Each backend has its own small thread pool, so a degraded backend can only
+tie up its own workers, never the hedge. When another backend can cover,
+calls use the shorter SEARCH_HEDGED_TIMEOUT_S. Calls still queued when a
+winner arrives are cancelled, and a backend whose pool is full gets
+hedged at once instead of after the hedge delay.
+
+SEARCH_BACKENDS is a comma list of `name` or `name=url`. `duckduckgo` and
+`serpapi` are built in. Any `name=url` entry is a SerpAPI-compatible JSON
+endpoint, e.g. a local stub server for testing.
+"""
+import math
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import httpx
+from duckduckgo_search import DDGS
+
+from app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+SERPAPI_URL = "https://serpapi.com/search"
+EWMA_ALPHA = 0.3
+MIN_SAMPLES = 3          # calls before a backend can be demoted
+MAX_ERROR_RATE = 0.5
+
+
+# ── Backends ──────────────────────────────────────────────────────────────────
+class SerpApiBackend:
+    """SerpAPI, or any endpoint returning SerpAPI-style `organic_results`."""
+
+    def __init__(self, name: str, url: str = SERPAPI_URL, api_key: str = ""):
+        self.name = name
+        self.url = url
+        self.api_key = api_key
+        # One client per backend: building one per call costs ~40 ms of CPU
+        self._client = httpx.Client()
+
+    def search(self, query: str, limit: int, timeout: float) -> list[dict]:
+        params = {"engine": "google", "q": query, "api_key": self.api_key, "num": limit}
+        resp = self._client.get(self.url, params=params, timeout=timeout)
+        resp.raise_for_status()
+        return [
+            {"title": r.get("title", "No title"), "snippet": r.get("snippet", ""), "url": r.get("link", "")}
+            for r in resp.json().get("organic_results", [])[:limit]
+        ]
+
+
+class DuckDuckGoBackend:
+    name = "duckduckgo"
+
+    def search(self, query: str, limit: int, timeout: float) -> list[dict]:
+        with DDGS(timeout=math.ceil(timeout)) as ddgs:
+            results = list(ddgs.text(query, max_results=limit, backend="api"))
+        return [
+            {"title": r.get("title", "No title"), "snippet": r.get("body", ""), "url": r.get("href", "")}
+            for r in results
+        ]
+
+
+def build_backends(spec: str) -> list:
+    backends = []
+    for entry in spec.split(","):
+        name, _, url = (part.strip() for part in entry.partition("="))
+        if not name:
+            continue
+        if name == "duckduckgo" and not url:
+            backends.append(DuckDuckGoBackend())
+        elif name == "serpapi":
+            if url or settings.SERPAPI_API_KEY:
+                backends.append(SerpApiBackend(name, url or SERPAPI_URL, settings.SERPAPI_API_KEY))
+        elif url:
+            backends.append(SerpApiBackend(name, url))
+        else:
+            logger.warning("Unknown search backend '%s' without a URL; skipping", name)
+    return backends
+
+
+# ── Health tracking ───────────────────────────────────────────────────────────
+class BackendStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency_ms: float | None = None   # EWMA
+        self.error_rate = 0.0                  # EWMA
+        self.demoted_until = 0.0
+
+    def record(self, latency_ms: float, ok: bool) -> None:
+        self.calls += 1
+        self.errors += 0 if ok else 1
+        if self.latency_ms is None:
+            self.latency_ms = latency_ms
+        else:
+            self.latency_ms += EWMA_ALPHA * (latency_ms - self.latency_ms)
+        self.error_rate += EWMA_ALPHA * ((0.0 if ok else 1.0) - self.error_rate)
+
+        if self.calls >= MIN_SAMPLES and (
+            self.error_rate > MAX_ERROR_RATE or self.latency_ms > settings.SEARCH_SLOW_MS
+        ):
+            self.demoted_until = time.monotonic() + settings.SEARCH_DEMOTE_SECONDS
+
+    @property
+    def demoted(self) -> bool:
+        return time.monotonic() < self.demoted_until
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "latency_ms": round(self.latency_ms, 1) if self.latency_ms is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "demoted": self.demoted,
+        }
+
+
+# ── Router ────────────────────────────────────────────────────────────────────
+class SearchRouter:
+    def __init__(
+        self,
+        backends: list,
+        hedge_ms: int = settings.SEARCH_HEDGE_MS,
+        merge_window_ms: int = settings.SEARCH_MERGE_WINDOW_MS,
+        timeout_s: float = settings.SEARCH_TIMEOUT_S,
+        hedged_timeout_s: float = settings.SEARCH_HEDGED_TIMEOUT_S,
+        workers_per_backend: int = settings.SEARCH_WORKERS_PER_BACKEND,
+    ):
+        self.backends = backends
+        self.hedge_s = hedge_ms / 1000
+        self.merge_window_s = merge_window_ms / 1000
+        self.timeout_s = timeout_s
+        # With more than one backend, any single call can give up sooner
+        self.call_timeout_s = min(timeout_s, hedged_timeout_s) if len(backends) > 1 else timeout_s
+        self.workers_per_backend = workers_per_backend
+        self.stats = {b.name: BackendStats() for b in backends}
+        self._pools = {
+            b.name: ThreadPoolExecutor(max_workers=workers_per_backend, thread_name_prefix=f"search-{b.name}")
+            for b in backends
+        }
+        self._in_flight = {b.name: 0 for b in backends}
+        self._lock = threading.Lock()
+
+    def ranked(self) -> list:
+        """Configured order, with demoted backends moved to the back."""
+        with self._lock:
+            return sorted(self.backends, key=lambda b: self.stats[b.name].demoted)
+
+    def _run(self, backend, query: str, limit: int) -> list[dict]:
+        start = time.perf_counter()
+        ok = False
+        try:
+            results = backend.search(query, limit, self.call_timeout_s)
+            ok = True
+            return results
+        finally:
+            with self._lock:
+                self._in_flight[backend.name] -= 1
+                self.stats[backend.name].record((time.perf_counter() - start) * 1000, ok)
+
+    def _submit(self, backend, query: str, limit: int):
+        """Start a call; also report whether it had to queue behind a full pool."""
+        with self._lock:
+            saturated = self._in_flight[backend.name] >= self.workers_per_backend
+            self._in_flight[backend.name] += 1
+        future = self._pools[backend.name].submit(self._run, backend, query, limit)
+        future.add_done_callback(lambda f: self._release_cancelled(f, backend.name))
+        return future, saturated
+
+    def _release_cancelled(self, future, name: str) -> None:
+        # A cancelled call never reaches _run, so its slot is released here
+        if future.cancelled():
+            with self._lock:
+                self._in_flight[name] -= 1
+
+    def search(self, query: str, limit: int = 5) -> list[dict] | None:
+        """
+        Return merged results, [] if backends answered with nothing,
+        or None if every backend failed or timed out.
+        """
+        waiting = self.ranked()
+        running: dict = {}
+        good: list[list[dict]] = []
+        empty = 0
+        deadline = time.monotonic() + self.timeout_s
+        merge_deadline = None
+        next_launch = 0.0
+
+        while True:
+            now = time.monotonic()
+            if good and now >= merge_deadline:
+                break
+            if not good and now >= deadline:
+                break
+            # Launch the next backend when the hedge delay is up or nothing is in flight
+            if not good and waiting and (not running or now >= next_launch):
+                backend = waiting.pop(0)
+                future, saturated = self._submit(backend, query, limit)
+                running[future] = backend
+                # A call stuck in a full pool is as good as slow: hedge right away
+                next_launch = now if saturated else now + self.hedge_s
+                continue
+            if not running:
+                break
+
+            if good:
+                cutoff = merge_deadline
+            else:
+                cutoff = min(deadline, next_launch) if waiting else deadline
+            done, _ = wait(running, timeout=max(cutoff - now, 0), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                backend = running.pop(future)
+                try:
+                    results = future.result()
+                except Exception as e:
+                    logger.info("Search backend %s failed: %s", backend.name, e)
+                    results = None
+                if results:
+                    good.append(results)
+                    merge_deadline = merge_deadline or time.monotonic() + self.merge_window_s
+                else:
+                    empty += results is not None
+                    next_launch = time.monotonic()   # don't wait out the hedge delay
+
+        # Losers still queued never start; in-flight ones end at call_timeout_s
+        for future in running:
+            future.cancel()
+
+        if good:
+            return _merge(good, limit)
+        return [] if empty else None
+
+    def stats_snapshot(self) -> dict:
+        with self._lock:
+            return {name: s.to_dict() for name, s in self.stats.items()}
+
+
+def _merge(result_sets: list[list[dict]], limit: int) -> list[dict]:
+    """Interleave result sets (winner first) and drop duplicate URLs."""
+    merged, seen = [], set()
+    for rank in range(max(len(rs) for rs in result_sets)):
+        for rs in result_sets:
+            if rank >= len(rs):
+                continue
+            key = rs[rank]["url"].rstrip("/").lower()
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(rs[rank])
+    return merged[:limit]
+
+
+search_router = SearchRouter(build_backends(settings.SEARCH_BACKENDS))
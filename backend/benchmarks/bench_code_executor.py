@@ -0,0 +1,82 @@
+"""
+Benchmark — execute_python with and without NumPy
+Times common numeric tasks written as pure-Python loops (what the agent
+writes without NumPy) against the equivalent NumPy code, both running
+through the RestrictedPython sandbox.
+Run: python -m benchmarks.bench_code_executor   (from backend/)
+"""
+import time
+
+from app.tools.code_executor import execute_python
+
+SETUP = "data = [((i * 7919) % 10007) / 10.0 for i in range(20000)]\n"
+NP_SETUP = "data = (np.arange(20000) * 7919 % 10007) / 10.0\n"
+
+TASKS = {
+    "percentiles (20k values)": (
+        SETUP + """
+s = sorted(data)
+def pct(p):
+    k = (len(s) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(s) - 1)
+    return s[lo] + (s[hi] - s[lo]) * (k - lo)
+result = [pct(50), pct(90), pct(99)]
+""",
+        NP_SETUP + "result = np.percentile(data, [50, 90, 99])\n",
+    ),
+    "moving average (20k, window 50)": (
+        SETUP + """
+w = 50
+out = []
+acc = sum(data[:w])
+out.append(acc / w)
+for i in range(w, len(data)):
+    acc += data[i] - data[i - w]
+    out.append(acc / w)
+result = len(out)
+""",
+        NP_SETUP + "result = np.convolve(data, np.ones(50) / 50, mode='valid').size\n",
+    ),
+    "matrix multiply (120x120)": (
+        """
+n = 120
+a = [[(i * j) % 7 for j in range(n)] for i in range(n)]
+b = [[(i + j) % 5 for j in range(n)] for i in range(n)]
+c = [[sum(a[i][k] * b[k][j] for k in range(n)) for j in range(n)] for i in range(n)]
+result = c[0][0]
+""",
+        """
+n = 120
+i, j = np.arange(n)[:, None], np.arange(n)[None, :]
+result = np.matmul((i * j) % 7, (i + j) % 5)[0, 0]
+""",
+    ),
+    "mean / stdev (20k values)": (
+        SETUP + "import statistics\nresult = (statistics.mean(data), statistics.pstdev(data))\n",
+        NP_SETUP + "result = (data.mean(), data.std())\n",
+    ),
+}
+
+
+def _time(code: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = execute_python.invoke(code)
+        best = min(best, time.perf_counter() - start)
+        if output.startswith(("Execution error", "Syntax error")):
+            raise RuntimeError(output)
+    return best * 1000
+
+
+def main(repeat: int = 3) -> None:
+    print(f"{'task':<34}{'pure Python':>14}{'NumPy':>12}{'speedup':>10}")
+    for name, (pure, vectorized) in TASKS.items():
+        t_pure = _time(pure, repeat)
+        t_np = _time(vectorized, repeat)
+        print(f"{name:<34}{t_pure:>11.1f} ms{t_np:>9.1f} ms{t_pure / t_np:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
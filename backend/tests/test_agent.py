@@ -69,6 +69,74 @@ def test_execute_python_statistics():
     assert "5" in result
 
 
+def test_execute_python_numpy():
+    from app.tools.code_executor import execute_python
+    result = execute_python.invoke(
+        "import numpy as np\ndata = np.arange(1, 101)\nprint(np.percentile(data, 90))"
+    )
+    assert "90.1" in result
+
+
+def test_execute_python_numpy_blocks_io():
+    from app.tools.code_executor import execute_python
+    for code in ("np.save('x.npy', np.ones(3))", "np.ones(3).tofile('x')", "from numpy import lib"):
+        result = execute_python.invoke(code)
+        assert "error" in result.lower()
+
+
+def test_execute_python_numpy_blocks_raw_pointers():
+    from app.tools.code_executor import execute_python
+    for code in (
+        "i = np.random.default_rng().bit_generator.ctypes\nprint(i.next_uint64(16))",
+        "rng = np.random.default_rng()\nprint(rng.bit_generator.cffi)",
+        "print(np.random.default_rng().bytes(10))",
+        "print(np.float64(1.5).data)",
+    ):
+        result = execute_python.invoke(code)
+        assert "AttributeError" in result
+
+
+def test_execute_python_numpy_size_cap():
+    from app.tools.code_executor import execute_python
+    result = execute_python.invoke("a = np.zeros((100000, 100000))")
+    assert "ArrayLimitError" in result
+
+
+@pytest.mark.parametrize("code", [
+    "a = np.ones(6000)\nb = a[:, None] * a",                      # broadcasting operator
+    "b = np.ones(3).repeat(20_000_000)",                          # array method
+    "g = np.meshgrid(np.arange(3000), np.arange(3000))",
+    "a = np.ones((10, 10))\ni = np.zeros(3000, dtype=np.int64)\nb = a[i[:, None], i]",  # fancy indexing
+    "a = np.ones((3000, 1))\nb = np.matmul(a, a.T)",
+    "a = np.arange(1_000_000).astype('U200')",                   # wide string dtypes
+    "a = np.ones(4_000_000, dtype='U100')",
+    "a = np.full(5_000_000, 'x' * 1000)",
+    "a = np.array([0] * 1_000_000 + ['x' * 1000])",
+    "a = np.zeros(10, dtype=('V', 10**8))",                       # raw / subarray dtypes
+    "a = np.ones(1000, dtype=('f8', (100000,)))",
+    "a = np.array(range(30_000_000))",                            # sized iterables
+    "a = np.ones(100, dtype='U10000')\nb = a[np.zeros(10000, dtype=np.int64)]",
+])
+def test_execute_python_numpy_cap_before_allocation(code):
+    import tracemalloc
+    from app.tools.code_executor import execute_python
+    tracemalloc.start()
+    try:
+        result = execute_python.invoke(code)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert "ArrayLimitError" in result
+    assert peak < 16 * 2**20
+
+
+def test_execute_python_summarizes_large_arrays():
+    from app.tools.code_executor import execute_python
+    result = execute_python.invoke("a = np.arange(100000)")
+    assert "shape=(100000,)" in result
+    assert len(result) < 500
+
+
 # ── Memory tests ──────────────────────────────────────────────────────────────
 def test_memory_isolation():
     from app.agent.react_agent import get_memory, clear_memory
@@ -81,3 +149,326 @@ def test_clear_session():
     r = client.delete("/session/test_session_123")
     assert r.status_code == 200
     assert "cleared" in r.json()["message"]
+
+
+# ── Profiling tests ───────────────────────────────────────────────────────────
+def test_profiling_span_tree():
+    from langchain.agents import AgentExecutor, create_react_agent
+    from langchain_core.language_models import FakeListChatModel
+    from app.agent.react_agent import REACT_PROMPT
+    from app.core.profiling import Trace, ProfilingCallbackHandler
+    from app.tools.code_executor import execute_python
+
+    llm = FakeListChatModel(responses=[
+        "Thought: compute it\nAction: execute_python\nAction Input: x = 6 * 7",
+        "Thought: I now have enough information to answer\nFinal Answer: 42",
+    ])
+    agent = create_react_agent(llm=llm, tools=[execute_python], prompt=REACT_PROMPT)
+    executor = AgentExecutor(agent=agent, tools=[execute_python])
+
+    trace = Trace("ask", cpu_profile=True).start()
+    result = executor.invoke(
+        {"input": "6 times 7?", "chat_history": ""},
+        config={"callbacks": [ProfilingCallbackHandler(trace)]},
+    )
+    trace.finish()
+    assert result["output"] == "42"
+
+    (agent_span,) = trace.root.children
+    assert agent_span.category == "agent"
+    categories = [c.category for c in agent_span.children]
+    assert categories == ["iteration", "iteration"]
+    first, second = agent_span.children
+    assert [c.category for c in first.children][-1] == "tool"
+    assert {"prompt", "llm", "parse", "tool"} <= {c.category for c in first.children}
+    assert "tool" not in {c.category for c in second.children}
+    tool_span = first.children[-1]
+    assert first.start_us <= tool_span.start_us and tool_span.end_us <= first.end_us
+
+    exported = trace.to_chrome_trace()
+    assert all(e["ph"] == "X" for e in exported["traceEvents"])
+    assert "samples" in exported and "stackFrames" in exported
+
+
+def test_trace_store_is_bounded():
+    from app.core.profiling import Trace, TraceStore
+    store = TraceStore(maxlen=2)
+    traces = [Trace(f"t{i}") for i in range(3)]
+    for t in traces:
+        t.finish()
+        store.add(t)
+    assert store.get(traces[0].trace_id) is None
+    assert [s["name"] for s in store.list()] == ["t2", "t1"]
+
+
+def test_traces_require_admin_token(monkeypatch):
+    from app.core.config import get_settings
+    settings = get_settings()
+
+    monkeypatch.setattr(settings, "PROFILE_ADMIN_TOKEN", "")
+    assert client.get("/traces").status_code == 403
+
+    monkeypatch.setattr(settings, "PROFILE_ADMIN_TOKEN", "s3cret")
+    assert client.get("/traces", headers={"X-Aria-Profile": "wrong"}).status_code == 403
+    assert client.get("/traces", headers={"X-Aria-Profile": "s3cret"}).status_code == 200
+    r = client.get("/traces/does-not-exist", headers={"X-Aria-Profile": "s3cret"})
+    assert r.status_code == 404
+
+
+# ── Job tests ─────────────────────────────────────────────────────────────────
+def _upload_txt(name: str, text: str = "Quarterly revenue grew 12%.") -> None:
+    import io
+    r = client.post("/upload", files={"file": (name, io.BytesIO(text.encode()), "text/plain")})
+    assert r.status_code == 200
+
+
+def test_summarize_job_api():
+    _upload_txt("job_report_a.txt")
+    r = client.post("/jobs/summarize", json={"filenames": ["job_report_a.txt"]})
+    assert r.status_code == 202
+    job = client.get(f"/jobs/{r.json()['job_id']}").json()
+    assert job["progress"]["total"] == 1
+    assert job["items"][0]["filename"] == "job_report_a.txt"
+
+
+def test_summarize_job_rejects_missing_files():
+    r = client.post("/jobs/summarize", json={"filenames": ["nope.pdf", "../etc/passwd"]})
+    assert r.status_code == 400
+    assert client.get("/jobs/unknown").status_code == 404
+
+
+def test_job_runner_processes_batches(tmp_path):
+    from app.jobs.store import JobStore
+    from app.jobs.worker import JobRunner
+
+    _upload_txt("job_report_b.txt")
+    _upload_txt("job_report_c.txt")
+    calls = []
+
+    def fake_batch(texts):
+        calls.append(len(texts))
+        return [f"summary of {len(t)} chars" for t in texts]
+
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create_job("summarize", ["job_report_b.txt", "job_report_c.txt", "missing.txt"])
+    runner = JobRunner(store, summarize_batch=fake_batch, batch_size=3, requests_per_minute=0)
+    runner.process(store.claim_items(runner.batch_size))
+
+    job = store.get_job(job_id)
+    assert calls == [2]
+    assert job["status"] == "completed"
+    assert job["progress"]["done"] == 2 and job["progress"]["failed"] == 1
+    assert job["items"][0]["result"].startswith("summary of")
+
+
+def test_job_runner_requeues_quota_errors_and_restarts(tmp_path):
+    import threading
+    import time
+    from app.jobs.store import JobStore
+    from app.jobs.worker import JobRunner
+
+    _upload_txt("job_report_d.txt")
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create_job("summarize", ["job_report_d.txt"])
+    runner = JobRunner(store, summarize_batch=lambda texts: [Exception("429 quota exceeded")] * len(texts),
+                       requests_per_minute=0)
+    runner.process(store.claim_items(1))
+    assert store.get_job(job_id)["items"][0]["status"] == "pending"
+
+    # The backoff is shared: no worker may send while the limiter is paused
+    assert runner.limiter.pause_until > time.monotonic()
+    stop = threading.Event()
+    threading.Timer(0.2, stop.set).start()
+    assert runner.limiter.acquire(1, stop) is False
+
+    # An item left running by a crash goes back to pending on startup
+    store.claim_items(1)
+    assert store.get_job(job_id)["status"] == "running"
+    assert JobStore(store.path).requeue_running() == 1
+    assert store.get_job(job_id)["status"] == "queued"
+
+
+def test_job_runner_error_keeps_finished_items(tmp_path):
+    from app.jobs.store import JobStore
+    from app.jobs.worker import JobRunner
+
+    _upload_txt("job_report_e.txt")
+    _upload_txt("job_report_f.txt")
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create_job("summarize", ["job_report_e.txt", "job_report_f.txt"])
+    runner = JobRunner(store, summarize_batch=lambda texts: ["ok"] * len(texts), requests_per_minute=0)
+
+    complete_item = store.complete_item
+
+    def flaky_complete(item_id, result):
+        if item_id != items[0]["id"]:
+            raise RuntimeError("disk I/O error")
+        complete_item(item_id, result)
+
+    store.complete_item = flaky_complete
+    items = store.claim_items(2)
+    runner.run_batch(items)
+
+    first, second = store.get_job(job_id)["items"]
+    assert (first["status"], first["result"]) == ("done", "ok")
+    assert second["status"] == "failed" and "disk I/O error" in second["error"]
+
+
+def test_job_runner_survives_store_errors(tmp_path, monkeypatch):
+    import sqlite3
+    import time
+    from app.jobs import worker
+    from app.jobs.store import JobStore
+    from app.jobs.worker import JobRunner
+
+    _upload_txt("job_report_g.txt")
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create_job("summarize", ["job_report_g.txt"])
+    monkeypatch.setattr(worker, "ERROR_BACKOFF_SECONDS", 0.05)
+
+    claim_items = store.claim_items
+    failures = []
+
+    def flaky_claim(limit):
+        if not failures:
+            failures.append(limit)
+            raise sqlite3.OperationalError("database is locked")
+        return claim_items(limit)
+
+    store.claim_items = flaky_claim
+    runner = JobRunner(store, summarize_batch=lambda texts: ["ok"] * len(texts), workers=1, requests_per_minute=0)
+    runner.start()
+    try:
+        deadline = time.monotonic() + 5
+        while store.get_job(job_id)["status"] != "completed" and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert failures
+        assert runner._threads[0].is_alive()
+        assert store.get_job(job_id)["items"][0]["result"] == "ok"
+    finally:
+        runner.stop()
+
+
+def test_job_runner_clamps_batch_to_rate_limit(tmp_path):
+    import threading
+    from app.jobs.store import JobStore
+    from app.jobs.worker import JobRunner
+
+    runner = JobRunner(JobStore(str(tmp_path / "jobs.sqlite3")), batch_size=10, requests_per_minute=4)
+    assert runner.batch_size == 4
+    with pytest.raises(ValueError):
+        runner.limiter.acquire(5, threading.Event())
+
+
+# ── Search backend tests (local SerpAPI-style stub servers) ──────────────────
+@pytest.fixture
+def stub_search_server():
+    import json
+    import threading
+    import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    servers = []
+
+    def start(urls, delay=0.0, status=200):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(delay)
+                body = json.dumps({"organic_results": [
+                    {"title": u, "snippet": "stub", "link": u} for u in urls
+                ]}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            request_queue_size = 64   # the default of 5 drops bursts of connects
+
+        server = Server(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}/search"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def test_search_hedges_slow_backend(stub_search_server):
+    import time
+    from app.tools.search_backends import SearchRouter, build_backends
+
+    slow = stub_search_server(["https://slow.example"], delay=1.0)
+    fast = stub_search_server(["https://fast.example"])
+    router = SearchRouter(build_backends(f"slow={slow},fast={fast}"), hedge_ms=100, merge_window_ms=50)
+
+    start = time.monotonic()
+    results = router.search("q")
+    assert time.monotonic() - start < 0.8
+    assert [r["url"] for r in results] == ["https://fast.example"]
+
+
+def test_search_merges_and_dedupes(stub_search_server):
+    from app.tools.search_backends import SearchRouter, build_backends
+
+    a = stub_search_server(["https://a.example", "https://shared.example/"])
+    b = stub_search_server(["https://shared.example", "https://b.example"], delay=0.05)
+    router = SearchRouter(build_backends(f"a={a},b={b}"), hedge_ms=0, merge_window_ms=500)
+
+    urls = [r["url"] for r in router.search("q")]
+    assert urls == ["https://a.example", "https://shared.example", "https://b.example"]
+
+
+def test_search_demotes_failing_backend(stub_search_server):
+    from app.tools.search_backends import SearchRouter, build_backends
+
+    broken = stub_search_server([], status=500)
+    healthy = stub_search_server(["https://ok.example"])
+    router = SearchRouter(build_backends(f"broken={broken},healthy={healthy}"), hedge_ms=1000)
+
+    for _ in range(3):
+        assert router.search("q")[0]["url"] == "https://ok.example"
+    assert router.stats_snapshot()["broken"]["demoted"]
+    assert [b.name for b in router.ranked()] == ["healthy", "broken"]
+
+
+def test_search_all_backends_failing(stub_search_server):
+    from app.tools.search_backends import SearchRouter, build_backends
+
+    broken = stub_search_server([], status=500)
+    empty = stub_search_server([])
+    assert SearchRouter(build_backends(f"x={broken}")).search("q") is None
+    assert SearchRouter(build_backends(f"x={broken},y={empty}")).search("q") == []
+
+
+def test_search_hedge_latency_bounded_under_load(stub_search_server):
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from app.tools.search_backends import SearchRouter, build_backends
+
+    slow = stub_search_server(["https://slow.example"], delay=3.0)
+    fast = stub_search_server(["https://fast.example"])
+    router = SearchRouter(
+        build_backends(f"slow={slow},fast={fast}"),
+        hedge_ms=100, merge_window_ms=20, hedged_timeout_s=0.5, workers_per_backend=10,
+    )
+
+    def timed(_):
+        start = time.monotonic()
+        results = router.search("q")
+        return time.monotonic() - start, results
+
+    # Twice as many searches as the slow backend has workers
+    with ThreadPoolExecutor(max_workers=20) as callers:
+        outcomes = list(callers.map(timed, range(20)))
+
+    assert max(elapsed for elapsed, _ in outcomes) < 1.0
+    assert all(results[0]["url"] == "https://fast.example" for _, results in outcomes)
+
+    # Losing calls give up at the hedged timeout instead of holding the pool
+    time.sleep(0.7)
+    assert router._in_flight == {"slow": 0, "fast": 0}